@@ -0,0 +1,71 @@
+# SPDX-License-Identifier: LSL-1.0
+# Copyright (c) 2026 Self Sovereign Society Foundation
+
+"""
+Shared by cleanup_build.py and fix_build.py: read build.zig as lines, find
+the lines that mention obsolete names, and write the result back
+"""
+
+import os
+import re
+import shutil
+from bisect import bisect_right
+from itertools import accumulate
+
+try:
+    # Hyperscan compiles every literal into one automaton and scans with SIMD
+    import pyperscan
+except ImportError:
+    pyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+def _on_match(offsets, tag, start, end):
+    offsets.append(end - 1)
+    return pyperscan.Scan.Continue
+
+def find_literals(data, literals):
+    """Return an offset inside every occurrence of any of literals in data
+
+    Uses pyperscan when installed, then pyahocorasick, then one compiled
+    alternation; the literals never span lines, so any offset will do.
+    """
+    if pyperscan is not None:
+        offsets = []
+        db = pyperscan.BlockDatabase(*(pyperscan.Pattern(re.escape(s), tag=0) for s in literals))
+        db.build(offsets, _on_match).scan(data)
+        return offsets
+    if ahocorasick is not None:
+        # latin-1 maps bytes to chars one to one, so offsets stay byte offsets
+        automaton = ahocorasick.Automaton()
+        for s in literals:
+            automaton.add_word(s.decode('latin-1'), None)
+        automaton.make_automaton()
+        return [end for end, _ in automaton.iter(data.decode('latin-1'))]
+    return [m.start() for m in re.compile(b'|'.join(re.escape(s) for s in literals)).finditer(data)]
+
+def matching_lines(lines, literals):
+    """Indices of the lines that contain any of literals"""
+    starts = list(accumulate(map(len, lines), initial=0))
+    return {bisect_right(starts, offset) - 1 for offset in find_literals(b''.join(lines), literals)}
+
+def read_lines(path='build.zig'):
+    """Read path as bytes lines; bytes.splitlines breaks on \n, \r and \r\n
+    only, keeping each line ending as it is"""
+    with open(path, 'rb') as f:
+        return f.read().splitlines(keepends=True)
+
+def write_lines(lines, path='build.zig'):
+    """Write lines over path via a temp file, so it is never half-written
+
+    A symlinked path is resolved so that its target gets rewritten, and the
+    temp file takes over the target's permission bits.
+    """
+    target = os.path.realpath(path)
+    with open(target + '.tmp', 'wb') as f:
+        f.writelines(lines)
+    shutil.copymode(target, target + '.tmp')
+    os.replace(target + '.tmp', target)
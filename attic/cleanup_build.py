@@ -5,11 +5,7 @@
 #!/usr/bin/env python3
 #!/usr/bin/env python3
 #!/usr/bin/env python3
-import re
-
-# Read the build.zig file
-with open('build.zig', 'r') as f:
-    content = f.read()
+from _build_scan import matching_lines, read_lines, write_lines
 
 # Remove obsolete test sections and their references
 obsolete_patterns = [
@@ -23,38 +19,22 @@ obsolete_patterns = [
     r'run_standalone_arena_tests'
 ]
 
-# Remove lines containing these patterns
-lines = content.split('\n')
-cleaned_lines = []
-
-skip_section = False
-for line in lines:
-    # Check if we should skip this line
-    should_skip = False
-    for pattern in obsolete_patterns:
-        if pattern in line:
-            should_skip = True
-            break
-
-    # Skip test sections that reference deleted files
-    if any(deleted_file in line for deleted_file in [
-        'validation_engine_optimized.zig',
-        'validation_engine_arena.zig',
-        'validation_engine_arena_integration.zig',
-        'validation_cache_system.zig',
-        'validation_performance_benchmark.zig',
-        'test_validation_engine_arena_memory.zig',
-        'test_arena_validation_standalone.zig',
-        'validation_memory_benchmarks.zig',
-        'test_validation_engine_simple_integration.zig'
-    ]):
-        should_skip = True
-
-    if not should_skip:
-        cleaned_lines.append(line)
+# Test sections that reference deleted files
+deleted_files = [
+    'validation_engine_optimized.zig',
+    'validation_engine_arena.zig',
+    'validation_engine_arena_integration.zig',
+    'validation_cache_system.zig',
+    'validation_performance_benchmark.zig',
+    'test_validation_engine_arena_memory.zig',
+    'test_arena_validation_standalone.zig',
+    'validation_memory_benchmarks.zig',
+    'test_validation_engine_simple_integration.zig'
+]
 
-# Write the cleaned content back
-with open('build.zig', 'w') as f:
-    f.write('\n'.join(cleaned_lines))
+# Scan the whole file for every literal at once and drop the lines they hit
+lines = read_lines()
+drop = matching_lines(lines, [s.encode() for s in obsolete_patterns + deleted_files])
+write_lines(line for i, line in enumerate(lines) if i not in drop)
 
 print("✅ Cleaned up build.zig")
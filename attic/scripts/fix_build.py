@@ -2,13 +2,30 @@
 
 import re
 
-# Read the current build.zig
-with open('build.zig', 'r') as f:
-    content = f.read()
+from _build_scan import matching_lines, read_lines, write_lines
+
+# Read the current build.zig, keeping each line ending as it is
+lines = read_lines()
+
+# Tests whose definitions are broken
+broken_tests = [
+    'validation_benchmarks',
+    'standalone_arena_tests',
+    'semantic_validation_integration_tests'
+]
+BROKEN_TEST = re.compile(b'|'.join(re.escape(s.encode()) for s in broken_tests))
+
+# Files that no longer exist
+deleted_files = [
+    'error_collection_optimized.zig',
+    'validation_optimization_proof.zig'
+]
+
+# Scan the whole file for every literal at once rather than line by line
+drop = matching_lines(lines, [s.encode() for s in deleted_files + broken_tests])
 
 # Remove broken test sections by finding complete test blocks
-lines = content.split('\n')
-cleaned_lines = []
+cleaned = []
 skip_until_blank = False
 in_broken_test = False
 
@@ -17,28 +34,21 @@ while i < len(lines):
     line = lines[i]
 
     # Check if this is a broken test definition
-    if 'b.addTest(.{' in line and ('validation_benchmarks' in line or 'standalone_arena_tests' in line or 'semantic_validation_integration_tests' in line):
+    if b'b.addTest(.{' in line and BROKEN_TEST.search(line):
         # Skip this entire test block until we find the next test or section
-        while i < len(lines) and not (lines[i].strip() == '' and i + 1 < len(lines) and ('const ' in lines[i+1] or '//' in lines[i+1])):
+        while i < len(lines) and not (lines[i].strip() == b'' and i + 1 < len(lines) and (b'const ' in lines[i+1] or b'//' in lines[i+1])):
             i += 1
         continue
 
     # Skip lines that reference deleted files or broken tests
-    if any(deleted in line for deleted in [
-        'error_collection_optimized.zig',
-        'validation_optimization_proof.zig',
-        'validation_benchmarks',
-        'standalone_arena_tests',
-        'semantic_validation_integration_tests'
-    ]):
+    if i in drop:
         i += 1
         continue
 
-    cleaned_lines.append(line)
+    cleaned.append(line)
     i += 1
 
 # Write back the cleaned content
-with open('build.zig', 'w') as f:
-    f.write('\n'.join(cleaned_lines))
+write_lines(cleaned)
 
 print("✅ Fixed build.zig")
\ No newline at end of file
@@ -0,0 +1,131 @@
+"""
+Shared patterns and file handling for the ArrayList migration scripts
+
+Each rewrite is one named pattern, and a script runs the ones it handles as
+separate passes in the order of the old one-regex-per-form scripts. They are
+not fused into one alternation: [^)]+ crosses lines, so a match started at
+an unclosed `var x = ArrayList(` or `.f = ArrayList(` would swallow a later
+declaration that the earlier pass rewrites on its own.
+"""
+
+import mmap
+import os
+import re
+import shutil
+import sys
+
+# Patterns in pass order; each group name keys its rewrite in DISPATCH
+PATTERNS = {
+    # var declaration with std.
+    'var_std': rb'(?P<var_std>var\s+(?P<var_std_name>\w+)\s*=\s*std\.ArrayList\((?P<var_std_type>[^)]+)\)\.init\([^)]+\))',
+    # var declaration without std.
+    'var': rb'(?P<var>var\s+(?P<var_name>\w+)\s*=\s*ArrayList\((?P<var_type>[^)]+)\)\.init\([^)]+\))',
+    # struct field with std.
+    'field_std': rb'(?P<field_std>\.(?P<field_std_name>\w+)\s*=\s*std\.ArrayList\([^)]+\)\.init\([^)]+\))',
+    # struct field without std.
+    'field': rb'(?P<field>\.(?P<field_name>\w+)\s*=\s*ArrayList\([^)]+\)\.init\([^)]+\))',
+    # HashMap.put with ArrayList.init
+    'init_std': rb'(?P<init_std>std\.ArrayList\((?P<init_std_type>[^)]+)\)\.init\([^)]+\))',
+    # ArrayList without std prefix in HashMap
+    'init': rb'(?P<init>ArrayList\((?P<init_type>[^)]+)\)\.init\([^)]+\))',
+    # toOwnedSlice()
+    'to_owned_slice': rb'(?P<to_owned_slice>return\s+(?P<to_owned_slice_name>\w+)\.toOwnedSlice\(\))',
+}
+
+DISPATCH = {
+    'var_std': lambda m: b"var %s: std.ArrayList(%s) = .empty" % (m['var_std_name'], m['var_std_type']),
+    'var': lambda m: b"var %s: ArrayList(%s) = .empty" % (m['var_name'], m['var_type']),
+    'field_std': lambda m: b".%s = .empty" % m['field_std_name'],
+    'field': lambda m: b".%s = .empty" % m['field_name'],
+    'init_std': lambda m: b"std.ArrayList(%s).empty" % m['init_std_type'],
+    'init': lambda m: b"ArrayList(%s).empty" % m['init_type'],
+    'to_owned_slice': lambda m: b"return try %s.toOwnedSlice(alloc)" % m['to_owned_slice_name'],
+}
+
+def compile_passes(*kinds):
+    """Compile the given patterns, one pass each, in table order"""
+    return tuple(re.compile(p) for kind, p in PATTERNS.items() if kind in kinds)
+
+def rewrite(m):
+    """Replacement for a match of any pattern in PATTERNS"""
+    return DISPATCH[m.lastgroup](m)
+
+def _needs_scan(content):
+    """Every rewrite needs one of these literals, and find() is far
+    cheaper than a regex scan over files that have none of them"""
+    return content.find(b'.toOwnedSlice()') >= 0 or (
+        content.find(b'ArrayList(') >= 0 and content.find(b').init(') >= 0)
+
+def write_migrated(filepath, content, backup=True):
+    """Swap in the migrated content atomically via a temp file and os.replace
+
+    A symlinked source is resolved first, so the link's target is rewritten
+    and the link itself survives. The backup is a hard link to the original
+    inode, so no bytes are copied.
+    """
+    filepath = os.path.realpath(filepath)
+    tmp = filepath + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(content)
+    shutil.copymode(filepath, tmp)
+
+    if backup:
+        backup_path = filepath + '.backup'
+        if os.path.lexists(backup_path):
+            os.remove(backup_path)
+        try:
+            os.link(filepath, backup_path)
+        except OSError:
+            # Filesystem without hard links
+            shutil.copyfile(filepath, backup_path)
+
+    os.replace(tmp, filepath)
+
+def migrate_file(filepath, passes, backup=True):
+    """Run each pass over filepath in turn; returns True if the file changed"""
+    # Map the file rather than reading it: the patterns are ASCII-only, so
+    # they run over the raw bytes with no decode and no heap copy of the input
+    with open(filepath, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return False
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as original:
+            if not _needs_scan(original):
+                return False
+
+            content = original
+            migrated = False
+            for pat in passes:
+                # Collect unmatched spans and replacements, then join once; a
+                # pass with no match moves on without building any output
+                out = []
+                last = 0
+                for m in pat.finditer(content):
+                    out.append(content[last:m.start()])
+                    out.append(rewrite(m))
+                    last = m.end()
+                if not out:
+                    continue
+                out.append(content[last:])
+                content = b''.join(out)
+                migrated = True
+            if not migrated:
+                return False
+
+    write_migrated(filepath, content, backup)
+
+    return True
+
+def main(passes):
+    """Command line of the single-file scripts: [--no-backup] <file.zig>"""
+    args = sys.argv[1:]
+    backup = '--no-backup' not in args
+    args = [a for a in args if a != '--no-backup']
+    if not args:
+        print(f"Usage: {os.path.basename(sys.argv[0])} [--no-backup] <file.zig>")
+        sys.exit(1)
+
+    filepath = args[0]
+    if migrate_file(filepath, passes, backup):
+        print(f"✅ Migrated: {filepath}")
+    else:
+        print(f"⏭️  No changes: {filepath}")
@@ -5,85 +5,58 @@ ArrayList Migration Script v4 - Handles complex patterns
 - HashMap with ArrayList values
 """
 
-import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
-def migrate_file(filepath):
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    original = content
-    
-    # Pattern 1: var declaration with std.
-    content = re.sub(
-        r'var\s+(\w+)\s*=\s*std\.ArrayList\(([^)]+)\)\.init\(([^)]+)\)',
-        r'var \1: std.ArrayList(\2) = .empty',
-        content
-    )
-    
-    # Pattern 2: var declaration without std.
-    content = re.sub(
-        r'var\s+(\w+)\s*=\s*ArrayList\(([^)]+)\)\.init\(([^)]+)\)',
-        r'var \1: ArrayList(\2) = .empty',
-        content
-    )
-    
-    # Pattern 3: struct field with std.
-    content = re.sub(
-        r'\.(\w+)\s*=\s*std\.ArrayList\([^)]+\)\.init\([^)]+\)',
-        r'.\1 = .empty',
-        content
-    )
-    
-    # Pattern 4: struct field without std.
-    content = re.sub(
-        r'\.(\w+)\s*=\s*ArrayList\([^)]+\)\.init\([^)]+\)',
-        r'.\1 = .empty',
-        content
-    )
-    
-    # Pattern 5: HashMap.put with ArrayList.init
-    content = re.sub(
-        r'std\.ArrayList\(([^)]+)\)\.init\(([^)]+)\)',
-        r'std.ArrayList(\1).empty',
-        content
-    )
-    
-    # Pattern 6: ArrayList without std prefix in HashMap
-    content = re.sub(
-        r'ArrayList\(([^)]+)\)\.init\(([^)]+)\)',
-        r'ArrayList(\1).empty',
-        content
-    )
-    
-    # Pattern 7: toOwnedSlice()
-    content = re.sub(
-        r'return\s+(\w+)\.toOwnedSlice\(\)',
-        r'return try \1.toOwnedSlice(alloc)',
-        content
-    )
-    
-    if content != original:
-        backup = filepath + '.backup'
-        with open(backup, 'w') as f:
-            f.write(original)
-        
-        with open(filepath, 'w') as f:
-            f.write(content)
-        
-        return True
-    return False
+from _arraylist_patterns import PATTERNS, compile_passes, migrate_file as _migrate_file
+
+# Every form, each as its own pass
+_PASSES = compile_passes(*PATTERNS)
+
+def migrate_file(filepath, backup=True):
+    """Migrate a single file"""
+    return _migrate_file(filepath, _PASSES, backup)
+
+def _migrate_or_error(filepath, backup=True):
+    """migrate_file, returning an OSError instead of raising it, so one
+    unreadable file does not stop the rest of a batch from being reported"""
+    try:
+        return migrate_file(filepath, backup)
+    except OSError as e:
+        return e
+
+def report(filepath, migrated):
+    """Print the outcome for one file; returns False if it failed"""
+    if isinstance(migrated, OSError):
+        print(f"❌ Failed: {filepath}: {migrated.strerror or migrated}", file=sys.stderr)
+        return False
+    if migrated:
+        print(f"✅ Migrated: {filepath}")
+    else:
+        print(f"⏭️  No changes: {filepath}")
+    return True
 
 def main():
-    if len(sys.argv) < 2:
-        print("Usage: migrate-arraylist-v4.py <file.zig>")
+    args = sys.argv[1:]
+    backup = '--no-backup' not in args
+    filepaths = [a for a in args if a != '--no-backup']
+    if not filepaths:
+        print("Usage: migrate-arraylist-v4.py [--no-backup] <file.zig> [<file.zig> ...]")
         sys.exit(1)
     
-    filepath = sys.argv[1]
-    if migrate_file(filepath):
-        print(f"✅ Migrated: {filepath}")
+    work = partial(_migrate_or_error, backup=backup)
+    if len(filepaths) == 1:
+        ok = report(filepaths[0], work(filepaths[0]))
     else:
-        print(f"⏭️  No changes: {filepath}")
+        # Files are independent: spread them over all cores, reporting in order
+        ok = True
+        with ProcessPoolExecutor() as ex:
+            for filepath, migrated in zip(filepaths, ex.map(work, filepaths, chunksize=16)):
+                ok = report(filepath, migrated) and ok
+    
+    if not ok:
+        sys.exit(1)
 
 if __name__ == '__main__':
     main()
@@ -9,61 +9,15 @@ Patterns:
 3. list.toOwnedSlice() → list.toOwnedSlice(alloc)
 """
 
-import re
-import sys
-from pathlib import Path
+from _arraylist_patterns import compile_passes, main, migrate_file as _migrate_file
 
-def migrate_file(filepath):
-    """Migrate a single file"""
-    with open(filepath, 'r') as f:
-        content = f.read()
-    
-    original = content
-    
-    # Pattern 1: ArrayList declaration
-    # var name = std.ArrayList(Type).init(alloc)
-    content = re.sub(
-        r'var\s+(\w+)\s*=\s*std\.ArrayList\(([^)]+)\)\.init\(([^)]+)\)',
-        r'var \1: std.ArrayList(\2) = .empty',
-        content
-    )
-    
-    # Pattern 2: errdefer deinit()
-    # errdefer name.deinit() → errdefer name.deinit(alloc)
-    # This is tricky - we need to know the allocator name
-    # For now, use a heuristic: find the allocator parameter name
-    
-    # Pattern 3: toOwnedSlice()
-    # return name.toOwnedSlice() → return try name.toOwnedSlice(alloc)
-    content = re.sub(
-        r'return\s+(\w+)\.toOwnedSlice\(\)',
-        r'return try \1.toOwnedSlice(alloc)',
-        content
-    )
-    
-    if content != original:
-        # Create backup
-        backup = filepath + '.backup'
-        with open(backup, 'w') as f:
-            f.write(original)
-        
-        # Write migrated content
-        with open(filepath, 'w') as f:
-            f.write(content)
-        
-        return True
-    return False
+# Pattern 2 (deinit) needs the allocator's name, which the script cannot
+# know, so only patterns 1 and 3 are rewritten
+_PASSES = compile_passes('var_std', 'to_owned_slice')
 
-def main():
-    if len(sys.argv) < 2:
-        print("Usage: migrate-arraylist.py <file.zig>")
-        sys.exit(1)
-    
-    filepath = sys.argv[1]
-    if migrate_file(filepath):
-        print(f"✅ Migrated: {filepath}")
-    else:
-        print(f"⏭️  No changes: {filepath}")
+def migrate_file(filepath, backup=True):
+    """Migrate a single file"""
+    return _migrate_file(filepath, _PASSES, backup)
 
 if __name__ == '__main__':
-    main()
+    main(_PASSES)
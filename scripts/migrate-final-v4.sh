@@ -12,13 +12,31 @@ FILES=$(find . -name "*.zig" -exec grep -l "ArrayList.*\.init(" {} \;)
 
 for file in $FILES; do
     TOTAL=$((TOTAL + 1))
-    
-    if python3 scripts/migrate-arraylist-v4.py "$file" 2>&1 | grep -q "✅"; then
-        COUNT=$((COUNT + 1))
-        echo "[$COUNT] $file"
-    fi
 done
 
+# One invocation for every file; the script spreads them across cores.
+# Its output is piped in unbuffered, so each file is reported as it finishes;
+# lastpipe keeps the loop in this shell so COUNT survives, and failures go to
+# stderr untouched.
+shopt -s lastpipe
+STATUS=0
+if [ -n "$FILES" ]; then
+    python3 -u scripts/migrate-arraylist-v4.py $FILES | while read -r line; do
+        case "$line" in
+            "✅ Migrated: "*)
+                COUNT=$((COUNT + 1))
+                echo "[$COUNT] ${line#✅ Migrated: }"
+                ;;
+        esac
+    done
+    STATUS=${PIPESTATUS[0]}
+fi
+
 echo ""
 echo "✅ Migrated: $COUNT files"
 echo "📊 Total checked: $TOTAL files"
+
+if [ "$STATUS" -ne 0 ]; then
+    echo "❌ migrate-arraylist-v4.py exited with status $STATUS" >&2
+fi
+exit "$STATUS"
@@ -2,8 +2,19 @@
 import subprocess
 import json
 import sys
+import threading
 import time
 
+try:
+    # orjson encodes straight to bytes in C; json is the stdlib fallback
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+    json_loads = json.loads
+
 # CONFIG
 LSP_BINARY = "./zig-out/bin/janus-lsp"
 
@@ -17,8 +28,41 @@ def rpc_encode(method, params=None, msg_id=None):
     if msg_id is not None:
         payload["id"] = msg_id
     
-    body = json.dumps(payload)
-    return f"Content-Length: {len(body)}\r\n\r\n{body}"
+    # Content-Length counts bytes, so frame the encoded body
+    body = json_dumps(payload)
+    return b"Content-Length: %d\r\n\r\n" % len(body) + body
+
+def read_message(pipe, log):
+    """Read one Content-Length framed LSP message and return it parsed.
+
+    Anything outside the framing (tracer output on the merged stderr) is
+    appended to log. Returns None once the pipe reaches EOF.
+    """
+    while True:
+        length = None
+        while True:
+            line = pipe.readline()
+            if not line:
+                return None
+            if length is None:
+                idx = line.find(b"Content-Length:")
+                if idx < 0:
+                    log.append(line)
+                    continue
+                if idx:
+                    log.append(line[:idx])
+                length = int(line[idx + len(b"Content-Length:"):])
+            elif not line.strip():
+                break
+
+        body = pipe.read(length)
+        if len(body) < length:
+            log.append(body)
+            return None
+        try:
+            return json_loads(body)
+        except ValueError:
+            log.append(body)
 
 def run_test():
     print(f"⚡ Spawning {LSP_BINARY}...")
@@ -26,9 +70,7 @@ def run_test():
         [LSP_BINARY],
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,  # Merge stderr into stdout for tracer visibility
-        text=True,
-        bufsize=0
+        stderr=subprocess.STDOUT  # Merge stderr into stdout for tracer visibility
     )
 
     # 1. HANDSHAKE (Initialize)
@@ -81,41 +123,36 @@ def run_test():
     # 5. LISTEN FOR THE SCREAM
     print("<< Listening for publishDiagnostics...")
     
-    start_time = time.time()
-    buffer = ""
-    diagnostics_found = False
-    
-    while time.time() - start_time < 3.0:
-        # Read available data without blocking
-        import select
-        ready = select.select([proc.stdout], [], [], 0.1)
-        if ready[0]:
-            chunk = proc.stdout.read(1024)
-            if not chunk:
+    log = []
+    diagnostics = None
+
+    # Blocking reads; the timer kills the server after 3s, which ends them with EOF
+    timer = threading.Timer(3.0, proc.kill)
+    timer.start()
+    try:
+        while True:
+            msg = read_message(proc.stdout, log)
+            if msg is None:
                 break
-            buffer += chunk
-            
-            if "publishDiagnostics" in buffer:
-                diagnostics_found = True
+            if msg.get("method") == "textDocument/publishDiagnostics":
+                diagnostics = msg
                 break
+    finally:
+        timer.cancel()
 
-    if diagnostics_found:
+    if diagnostics is not None:
         print("\\n🚨 VICTORY: Received publishDiagnostics!")
-        print("Buffer tail:")
-        print(buffer[-500:])
+        print("Message:")
+        print(json.dumps(diagnostics)[:500])
         proc.terminate()
         proc.wait(timeout=2)
         return True
     else:
         print("\\n❌ FAILURE: Timed out waiting for diagnostics.")
-        print("Buffer content:", buffer[:1000])
-        
-        # Check stderr for errors
+        # stderr is merged into stdout, so server errors end up in the log
+        print("Server output:", b"".join(log)[:1000].decode("utf-8", "replace"))
         proc.terminate()
         proc.wait(timeout=2)
-        stderr_output = proc.stderr.read()
-        if stderr_output:
-            print("\\nStderr:", stderr_output)
         return False
 
 if __name__ == "__main__":
@@ -5,93 +5,266 @@
 #!/usr/bin/env python3
 #!/usr/bin/env python3
 #!/usr/bin/env python3
-import os, re, sys, argparse, shutil, json
+import os, sys, argparse, shutil, json, mmap
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 from pathlib import Path
 
+try:
+    # google-re2 matches in linear time; its API mirrors the subset of re used here
+    import re2 as re
+except ImportError:
+    import re
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# RE2 has no backreferences, so the declaration and the `defer <var>.deinit(<alloc>);`
+# that pairs with it are matched separately and joined up in _find_defer.
 ARRAYLIST_DECL = re.compile(
-    r"""(?P<indent>\s*)var\s+
-        (?P<name>[A-Za-z_]\w*)\s*=\s*
-        std\.ArrayList\(\s*(?P<type>[^)]+?)\s*\)\s*\{\s*\}\s*;
-        (?P<tail>.*?)?
-        defer\s+\2\.deinit\(\s*(?P<alloc>[A-Za-z_]\w*)\s*\)\s*;
-    """,
-    re.VERBOSE | re.DOTALL
+    r"(?P<indent>\s*)var\s+"
+    r"(?P<name>[A-Za-z_]\w*)\s*=\s*"
+    r"std\.ArrayList\(\s*(?P<type>[^)]+?)\s*\)\s*\{\s*\}\s*;"
+)
+DEFER_DEINIT = re.compile(
+    r"defer\s+(?P<name>[A-Za-z_]\w*)\.deinit\(\s*(?P<alloc>[A-Za-z_]\w*)\s*\)\s*;"
+)
+
+# How far past a declaration its paired defer may start
+_DEFER_WINDOW = 4096
+
+def _find_defer(text: str, pos: int, name: str):
+    """Find the first `defer <name>.deinit(<alloc>);` starting within _DEFER_WINDOW of pos.
+
+    Returns (alloc, end) or None. Candidates are located with str.find and
+    each statement is matched on its own, so the work per declaration is
+    bounded by the window rather than by the rest of the file.
+    """
+    limit = pos + _DEFER_WINDOW + len("defer")
+    while True:
+        start = text.find("defer", pos, limit)
+        if start < 0:
+            return None
+        semi = text.find(";", start)
+        if semi < 0:
+            return None
+        d = DEFER_DEINIT.fullmatch(text[start:semi + 1])
+        if d is not None and d.group('name') == name:
+            return d.group('alloc'), semi + 1
+        pos = start + len("defer")
+
+# Methods whose allocator argument is dropped, with the token that follows it
+_METHOD_CALLS = (
+    ("append", ","),
+    ("appendSlice", ","),
+    ("writer", ")"),
+    ("toOwnedSlice", ")"),
+    ("deinit", ")"),
 )
 
-def rewrite_file(path: Path, dry_run: bool=False) -> dict:
-    text = path.read_text(encoding='utf-8', errors='ignore')
+def _method_call_repl(name: str, method: str, close: str) -> str:
+    return f"{name}.{method}(" if close == "," else f"{name}.{method}()"
+
+# Var and allocator names repeat across a tree (out/alloc, buf/gpa, ...), so
+# compiled rewrites are kept for the whole run; each pool worker has its own
+@lru_cache(maxsize=4096)
+def _method_patterns(name: str, alloc: str) -> tuple:
+    """Compile the method-call rewrites for one var/alloc pair."""
+    n, a = re.escape(name), re.escape(alloc)
+    return tuple(
+        (re.compile(rf"{n}\.{method}\(\s*{a}\s*\{close}"), _method_call_repl(name, method, close))
+        for method, close in _METHOD_CALLS
+    )
+
+def _skip_alloc(text: str, i: int, allocs: list, close: str) -> int:
+    """Return the index just past `<alloc><close>` (whitespace allowed) at i, or -1."""
+    while i < len(text) and text[i].isspace():
+        i += 1
+    for alloc in allocs:
+        if text.startswith(alloc, i):
+            j = i + len(alloc)
+            while j < len(text) and text[j].isspace():
+                j += 1
+            if text.startswith(close, j):
+                return j + 1
+    return -1
+
+# Files that declare the same var/alloc pairs share one automaton
+@lru_cache(maxsize=1024)
+def _method_automaton(pairs: tuple):
+    """Build the Aho-Corasick automaton over every `<var>.<method>(` literal for pairs."""
+    automaton = ahocorasick.Automaton()
+    for name, alloc in pairs:
+        for method, close in _METHOD_CALLS:
+            key = f"{name}.{method}("
+            entry = automaton.get(key, None)
+            if entry is None:
+                entry = (key, _method_call_repl(name, method, close), close, [])
+                automaton.add_word(key, entry)
+            entry[3].append(alloc)
+    automaton.make_automaton()
+    return automaton
+
+def _rewrite_method_calls(text: str, pairs: tuple) -> tuple:
+    """Drop the allocator argument from method calls on the rewritten vars.
+
+    Every call starts with the literal `<var>.<method>(`, so a single
+    Aho-Corasick pass finds all candidates; each is checked against the
+    var's allocators and spliced into one output buffer.
+    """
+    automaton = _method_automaton(pairs)
+    hits = sorted(((end - len(e[0]) + 1, e) for end, e in automaton.iter(text)), key=lambda h: h[0])
+    out = []
+    last = n = 0
+    for start, (key, repl, close, allocs) in hits:
+        if start < last:
+            continue
+        end = _skip_alloc(text, start + len(key), allocs, close)
+        if end < 0:
+            continue
+        out.append(text[last:start])
+        out.append(repl)
+        last = end
+        n += 1
+    out.append(text[last:])
+    return "".join(out), n
+
+# Literals any declaration rewrite needs; files missing one are skipped undecoded
+_REQUIRED = (b"std.ArrayList(", b".deinit(")
+
+def _read_text(path: Path):
+    """Decode the file straight from a read-only mapping, without the bytes copy read() makes.
+
+    Returns None, without decoding, when the file lacks one of _REQUIRED.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if any(mm.find(lit) < 0 for lit in _REQUIRED):
+                return None
+            text = str(mm, 'utf-8', 'ignore')
+    # Same newline handling as text-mode reads
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _replace_file(path: Path, text: str, backup: bool) -> None:
+    """Write text to a temp file and os.replace it over path.
+
+    A symlinked path is resolved first, so its target is rewritten and the
+    link survives. The .bak backup is a hard link to the original inode, so
+    no bytes are copied.
+    """
+    path = path.resolve()
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding='utf-8')
+    shutil.copymode(path, tmp)
+    if backup:
+        bak = path.with_suffix(path.suffix + ".bak")
+        try:
+            bak.unlink(missing_ok=True)
+            os.link(path, bak)
+        except OSError:
+            # Filesystem without hard links; the backup stays best-effort
+            try:
+                shutil.copyfile(path, bak)
+            except OSError:
+                pass
+    os.replace(tmp, path)
+
+def rewrite_file(path: Path, dry_run: bool=False, backup: bool=True) -> dict:
+    text = _read_text(path)
     changed = False
     rewrites = []
+    if text is None:
+        return {"file": str(path), "changed": changed, "rewrites": rewrites}
 
-    # Iterative scan and rebuild
+    # Single scan over the declarations; pos marks how far the output has been copied
     pos = 0
     out = []
-    while pos < len(text):
-        m = ARRAYLIST_DECL.search(text, pos)
-        if not m:
-            out.append(text[pos:])
-            break
+    for m in ARRAYLIST_DECL.finditer(text):
+        if m.start() < pos:
+            # Inside a declaration/defer span that has already been rewritten
+            continue
+
+        name = m.group('name')
+        found = _find_defer(text, m.end(), name)
+        if not found:
+            # No paired defer: leave this declaration as it is
+            continue
+        alloc, end = found
 
         out.append(text[pos:m.start()])
 
         indent = m.group('indent')
-        name = m.group('name')
         typ  = m.group('type')
-        alloc = m.group('alloc')
 
         decl = f"{indent}var {name} = List({typ}).with({alloc});\n"
         defer = f"{indent}defer {name}.deinit();\n"
         out.append(decl + defer)
 
-        pos = m.end()
+        pos = end
         changed = True
-        rewrites.append({"var": name, "type": typ, "alloc": alloc, "span": [m.start(), m.end()]})
+        rewrites.append({"var": name, "type": typ, "alloc": alloc, "span": [m.start(), end]})
+    out.append(text[pos:])
 
     new_text = "".join(out)
 
-    # Method-call rewrites for each var/alloc pair
-    if rewrites:
-        for r in rewrites:
-            name = r["var"]
-            alloc = r["alloc"]
-            patterns = [
-                (rf"{re.escape(name)}\.append\(\s*{re.escape(alloc)}\s*,", f"{name}.append("),
-                (rf"{re.escape(name)}\.appendSlice\(\s*{re.escape(alloc)}\s*,", f"{name}.appendSlice("),
-                (rf"{re.escape(name)}\.writer\(\s*{re.escape(alloc)}\s*\)", f"{name}.writer()"),
-                (rf"{re.escape(name)}\.toOwnedSlice\(\s*{re.escape(alloc)}\s*\)", f"{name}.toOwnedSlice()"),
-                (rf"{re.escape(name)}\.deinit\(\s*{re.escape(alloc)}\s*\)", f"{name}.deinit()"),
-            ]
-            for pat, repl in patterns:
-                new_text2, n = re.subn(pat, repl, new_text)
+    # Method-call rewrites for each distinct var/alloc pair
+    pairs = tuple(dict.fromkeys((r["var"], r["alloc"]) for r in rewrites))
+    if pairs and ahocorasick is not None:
+        new_text, n = _rewrite_method_calls(new_text, pairs)
+        if n > 0:
+            changed = True
+    else:
+        # Without pyahocorasick: one regex scan per pattern
+        for name, alloc in pairs:
+            for pat, repl in _method_patterns(name, alloc):
+                new_text2, n = pat.subn(repl, new_text)
                 if n > 0:
                     changed = True
                 new_text = new_text2
 
-    if changed:
-        if not dry_run:
-            backup = path.with_suffix(path.suffix + ".bak")
-            try:
-                shutil.copyfile(path, backup)
-            except Exception:
-                pass
-            path.write_text(new_text, encoding='utf-8')
+    # Never write (or back up) a file whose content would come out identical
+    changed = changed and new_text != text
+    if changed and not dry_run:
+        _replace_file(path, new_text, backup)
 
     return {"file": str(path), "changed": changed, "rewrites": rewrites}
 
+def _positive_int(value: str) -> int:
+    n = int(value)
+    if n < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {n}")
+    return n
+
 def main():
     ap = argparse.ArgumentParser(description="Migrate Zig ArrayList usage to context-bound List(T) wrapper.")
     ap.add_argument("paths", nargs="+", help="Files or directories to process")
     ap.add_argument("--dry-run", action="store_true", help="Do not modify files; print planned changes")
+    ap.add_argument("--no-backup", action="store_true", help="Do not keep .bak copies of modified files")
+    ap.add_argument("-j", "--jobs", type=_positive_int, default=None, help="Worker processes (default: CPU count; 1 disables the pool)")
     args = ap.parse_args()
 
-    results = []
+    files = []
     for p in args.paths:
         pth = Path(p)
         if pth.is_dir():
-            for fp in pth.rglob("*.zig"):
-                results.append(rewrite_file(fp, dry_run=args.dry_run))
+            files.extend(pth.rglob("*.zig"))
         elif pth.is_file() and pth.suffix == ".zig":
-            results.append(rewrite_file(pth, dry_run=args.dry_run))
+            files.append(pth)
+
+    # Files are independent and the work is CPU-bound, so fan out across
+    # processes; map() keeps the report in input order
+    work = partial(rewrite_file, dry_run=args.dry_run, backup=not args.no_backup)
+    if args.jobs == 1 or len(files) < 2:
+        results = list(map(work, files))
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs) as ex:
+            results = list(ex.map(work, files, chunksize=16))
     print(json.dumps(results, indent=2))
 
 if __name__ == "__main__":
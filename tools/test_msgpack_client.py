@@ -18,28 +18,55 @@ import msgpack
 import time
 import sys
 
+# Pipe buffer size for the daemon's stdio; one frame fits in a single flush
+PIPE_BUFFER_SIZE = 64 * 1024
+
 def send_framed_message(process, message_data):
     """Send a length-prefixed MessagePack message to the daemon."""
-    # Length prefix (4 bytes, big-endian)
-    length = len(message_data)
-    length_bytes = struct.pack('>I', length)
-
-    # Send length + payload
-    process.stdin.write(length_bytes)
-    process.stdin.write(message_data)
+    # Length prefix (4 bytes, big-endian) and payload in a single write
+    process.stdin.write(struct.pack('>I', len(message_data)) + message_data)
     process.stdin.flush()
 
+def read_exact(stream, size):
+    """Read up to size bytes into one preallocated buffer, retrying short reads.
+
+    Returns fewer than size bytes only if the stream hits EOF.
+    """
+    buf = bytearray(size)
+    view = memoryview(buf)
+    filled = 0
+    while filled < size:
+        n = stream.readinto(view[filled:])
+        if not n:
+            return buf[:filled]
+        filled += n
+    return buf
+
 def read_framed_message(process):
     """Read a length-prefixed MessagePack message from the daemon."""
+    stdout = process.stdout
+
+    # When the prefix is already buffered, read prefix and payload together
+    # into one bytearray(length + 4) with a single readinto
+    head = stdout.peek(4)
+    if len(head) >= 4:
+        length = struct.unpack_from('>I', head)[0]
+        frame = read_exact(stdout, length + 4)
+        if len(frame) != length + 4:
+            raise Exception(f"Failed to read payload, expected {length} bytes, got {max(len(frame) - 4, 0)}")
+        # Trimming the front of a bytearray is O(1), the payload is not copied
+        del frame[:4]
+        return frame
+
     # Read 4-byte length prefix
-    length_bytes = process.stdout.read(4)
+    length_bytes = read_exact(stdout, 4)
     if len(length_bytes) != 4:
         raise Exception(f"Failed to read length prefix, got {len(length_bytes)} bytes")
 
     length = struct.unpack('>I', length_bytes)[0]
 
     # Read payload
-    payload = process.stdout.read(length)
+    payload = read_exact(stdout, length)
     if len(payload) != length:
         raise Exception(f"Failed to read payload, expected {length} bytes, got {len(payload)}")
 
@@ -55,7 +82,8 @@ def test_ping_msgpack():
         daemon_cmd,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE
+        stderr=subprocess.PIPE,
+        bufsize=PIPE_BUFFER_SIZE
     )
 
     try: